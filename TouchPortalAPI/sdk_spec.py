@@ -14,6 +14,10 @@ Table attributes:
   - `c`: optional list of valid value(s) (choices)
   - `l`: lookup table for child data structures, if any
 
+The tables are written out in the above form as `TPSDK_ATTRIBS_*_RAW` dicts.
+The `TPSDK_ATTRIBS_*` tables are built from those at import time as `AttribTable`s, which map each
+attribute name to an `AttribSpec` tuple, with any child lookup tables also converted.
+
 TODO: List valid attribute values per SDK version?
 """
 
@@ -37,10 +41,47 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+from collections import namedtuple
+
 TPSDK_DEFAULT_VERSION = 3
 """ Default Touch Portal SDK version for generating entry.tp JSON. """
 
-TPSDK_ATTRIBS_SETTINGS = {
+AttribSpec = namedtuple('AttribSpec', 'name typ default required min_sdk choices subtable')
+"""
+Specification of one attribute in a `TPSDK_ATTRIBS_*` table. The fields correspond to the raw table attributes:
+`typ` = `t`, `default` = `d`, `required` = `r`, `min_sdk` = `v`, `choices` = `c`, and `subtable` = `l`.
+"""
+
+class AttribTable(dict):
+    """ A `TPSDK_ATTRIBS_*` table, mapping attribute names to `AttribSpec`s. `required` is a frozenset of the required attribute names. """
+    __slots__ = ('required',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.required = frozenset(k for k, attrib in self.items() if attrib.required)
+
+_g_spec_tables = {}  # module tables converted so far, keyed by id of the raw table, so nested tables are only converted once
+
+def attribSpecFromDict(name:str, data:dict):
+    """ Returns an `AttribSpec` for attribute `name` built from a raw table entry `data` (eg. `TPSDK_ATTRIBS_ACTION_RAW['id']`). """
+    return _attribSpec(name, data)
+
+def _attribSpec(name:str, data:dict, cache:dict=None):
+    subtable = data.get('l')
+    if isinstance(subtable, dict):
+        subtable = _specTable(subtable, cache)
+    return AttribSpec(name, data.get('t', str), data.get('d'), data.get('r', False), data.get('v'), data.get('c'), subtable)
+
+def _specTable(raw:dict, cache:dict=None):
+    # `cache` is only used while building the module's own tables, whose raw dicts live as long as the module does.
+    if cache is not None and (cached := cache.get(id(raw))) and cached[0] is raw:
+        return cached[1]
+    table = AttribTable((k, _attribSpec(k, data, cache)) for k, data in raw.items())
+    if cache is not None:
+        cache[id(raw)] = (raw, table)
+    return table
+
+TPSDK_ATTRIBS_SETTINGS_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]    [valid value list]
   'name':             { 'v': 3, 'r': True,  't': str },
   'type':             { 'v': 3, 'r': True,  't': str,   'd': "text",        'c': ["text","number"] },
@@ -51,9 +92,10 @@ TPSDK_ATTRIBS_SETTINGS = {
   'maxValue':         { 'v': 3, 'r': False, 't': int },
   'readOnly':         { 'v': 3, 'r': False, 't': bool,  'd': False },
 }
+TPSDK_ATTRIBS_SETTINGS = _specTable(TPSDK_ATTRIBS_SETTINGS_RAW, _g_spec_tables)
 """ [Settings structure](https://www.touch-portal.com/api/index.php?section=settings) """
 
-TPSDK_ATTRIBS_STATE = {
+TPSDK_ATTRIBS_STATE_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]    [valid value list]
   'id':               { 'v': 1, 'r': True,  't': str },
   'type':             { 'v': 1, 'r': True,  't': str,   'd': "text",        'c': ["text","choice"]},
@@ -61,9 +103,10 @@ TPSDK_ATTRIBS_STATE = {
   'default':          { 'v': 1, 'r': True,  't': str,   'd': "" },
   'valueChoices':     { 'v': 1, 'r': False, 't': list },
 }
+TPSDK_ATTRIBS_STATE = _specTable(TPSDK_ATTRIBS_STATE_RAW, _g_spec_tables)
 """ [State structure](https://www.touch-portal.com/api/index.php?section=states) """
 
-TPSDK_ATTRIBS_EVENT = {
+TPSDK_ATTRIBS_EVENT_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]    [valid value list]
   'id':               { 'v': 1, 'r': True,  't': str },
   'name':             { 'v': 1, 'r': True,  't': str },
@@ -73,9 +116,10 @@ TPSDK_ATTRIBS_EVENT = {
   'valueType':        { 'v': 1, 'r': True,  't': str,   'd': "choice",      'c': ["choice"] },
   'valueStateId':     { 'v': 1, 'r': True,  't': str },
 }
+TPSDK_ATTRIBS_EVENT = _specTable(TPSDK_ATTRIBS_EVENT_RAW, _g_spec_tables)
 """ [Event structure](https://www.touch-portal.com/api/index.php?section=events) """
 
-TPSDK_ATTRIBS_ACT_DATA = {
+TPSDK_ATTRIBS_ACT_DATA_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]    [valid value list]
   'id':               { 'v': 1, 'r': True,  't': str },
   'type':             { 'v': 1, 'r': True,  't': str,   'd': "text",        'c': ["text","number","switch","choice","file","folder","color"] },
@@ -87,9 +131,10 @@ TPSDK_ATTRIBS_ACT_DATA = {
   'minValue':         { 'v': 3, 'r': False, 't': int },
   'maxValue':         { 'v': 3, 'r': False, 't': int }
 }
+TPSDK_ATTRIBS_ACT_DATA = _specTable(TPSDK_ATTRIBS_ACT_DATA_RAW, _g_spec_tables)
 """ [Action Data structure](https://www.touch-portal.com/api/index.php?section=action-data) """
 
-TPSDK_ATTRIBS_ACTION = {
+TPSDK_ATTRIBS_ACTION_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]    [valid value list]   [lookup table]
   'id':               { 'v': 1, 'r': True,  't': str },
   'name':             { 'v': 1, 'r': True,  't': str },
@@ -101,32 +146,35 @@ TPSDK_ATTRIBS_ACTION = {
   'execution_cmd':    { 'v': 1, 'r': False, 't': str },
   'tryInline':        { 'v': 1, 'r': False, 't': bool },
   'hasHoldFunctionality': { 'v': 3, 'r': False, 't': bool },
-  'data':             { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_ACT_DATA },
+  'data':             { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_ACT_DATA_RAW },
 }
+TPSDK_ATTRIBS_ACTION = _specTable(TPSDK_ATTRIBS_ACTION_RAW, _g_spec_tables)
 """ [Dynamic Action structure](https://www.touch-portal.com/api/index.php?section=dynamic-actions) """
 
-TPSDK_ATTRIBS_CONNECTOR = {
+TPSDK_ATTRIBS_CONNECTOR_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]    [valid value list]   [lookup table]
   'id':               { 'v': 4, 'r': True,  't': str },
   'name':             { 'v': 4, 'r': True,  't': str },
   'format':           { 'v': 4, 'r': False, 't': str },
-  'data':             { 'v': 4, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_ACT_DATA },  # same data as Actions? TP API docs are still vague
+  'data':             { 'v': 4, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_ACT_DATA_RAW },  # same data as Actions? TP API docs are still vague
 }
+TPSDK_ATTRIBS_CONNECTOR = _specTable(TPSDK_ATTRIBS_CONNECTOR_RAW, _g_spec_tables)
 """ [Connector structure](https://www.touch-portal.com/api/index.php?section=connectors) """
 
-TPSDK_ATTRIBS_CATEGORY = {
+TPSDK_ATTRIBS_CATEGORY_RAW = {
 # key name              sdk V   required    [type(s)]  [lookup table]
   'id':               { 'v': 1, 'r': True,  't': str },  # dynamic default id based on plugin id?
   'name':             { 'v': 1, 'r': True,  't': str },  # dynamic default based on plugin name?
   'imagepath':        { 'v': 1, 'r': False, 't': str },
-  'actions':          { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_ACTION },
-  'connectors':       { 'v': 4, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_CONNECTOR },
-  'states':           { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_STATE },
-  'events':           { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_EVENT },
+  'actions':          { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_ACTION_RAW },
+  'connectors':       { 'v': 4, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_CONNECTOR_RAW },
+  'states':           { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_STATE_RAW },
+  'events':           { 'v': 1, 'r': False, 't': list, 'l': TPSDK_ATTRIBS_EVENT_RAW },
 }
+TPSDK_ATTRIBS_CATEGORY = _specTable(TPSDK_ATTRIBS_CATEGORY_RAW, _g_spec_tables)
 """ [Category structure](https://www.touch-portal.com/api/index.php?section=categories) """
 
-TPSDK_ATTRIBS_ROOT = {
+TPSDK_ATTRIBS_ROOT_RAW = {
 # key name              sdk V   required    [type(s)]    [default value]            [valid value list]   [lookup table]
   'sdk':              { 'v': 1, 'r': True,  't': int,   'd': TPSDK_DEFAULT_VERSION, 'c': [1,2,3,4] },
   'version':          { 'v': 1, 'r': True,  't': int,   'd': 1 },
@@ -134,7 +182,10 @@ TPSDK_ATTRIBS_ROOT = {
   'id':               { 'v': 1, 'r': True,  't': str },
   'configuration':    { 'v': 1, 'r': False, 't': dict },
   'plugin_start_cmd': { 'v': 1, 'r': False, 't': str },
-  'categories':       { 'v': 1, 'r': True,  't': list,  'd': [], 'l': TPSDK_ATTRIBS_CATEGORY },
-  'settings':         { 'v': 3, 'r': False, 't': list,  'd': [], 'l': TPSDK_ATTRIBS_SETTINGS },
+  'categories':       { 'v': 1, 'r': True,  't': list,  'd': [], 'l': TPSDK_ATTRIBS_CATEGORY_RAW },
+  'settings':         { 'v': 3, 'r': False, 't': list,  'd': [], 'l': TPSDK_ATTRIBS_SETTINGS_RAW },
 }
+TPSDK_ATTRIBS_ROOT = _specTable(TPSDK_ATTRIBS_ROOT_RAW, _g_spec_tables)
 """ [Plugin structure](https://www.touch-portal.com/api/index.php?section=structure) """
+
+del _g_spec_tables
@@ -34,6 +34,10 @@ This script exits with status code -1 (error) if generation or validation produc
 All progress and warning messages are printed to stderr stream.
 ```
 
+If the optional [orjson](https://pypi.org/project/orjson/) package is installed it will be used to write the generated JSON
+when the indent level is 2 (the default) or -1. Note that in this case any non-ASCII characters are written as UTF-8 instead of
+being escaped.
+
 ## TODO/Ideas:
 
 * Dynamic default values, eg. for action prefix or category id/name (see notes in sdk_spec tables).
@@ -65,16 +69,30 @@ import sys
 import os.path
 import importlib.util
 import json
+from copy import deepcopy
 from types import ModuleType
 from typing import (Union, TextIO)
 from re import compile as re_compile
 
-sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
-from sdk_spec import *
+try:
+    import orjson  # optional, faster JSON serializer
+except ImportError:
+    orjson = None
+
+if __package__:
+    from .sdk_spec import *
+else:
+    # running as a stand-alone script
+    sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+    from sdk_spec import *
 
 ## globals
 g_messages = []  # validation reporting
 g_seen_ids = {}  # for validating unique IDs
+g_module_cache = {}  # plugin modules loaded from file as (mtime, size, module), keyed by real path
+
+## constants
+_FMT_TOKEN_RX = re_compile(r'\$\[(\w+)\]')  # matches `format` replacement tokens like `$[1]` or `$[name]`
 
 
 ## Utils
@@ -130,59 +148,75 @@ def _dictFromItem(item:dict, table:dict, sdk_v:int, path:str="", skip_invalid:bo
     ret = {}
     if not isinstance(item, dict):
         return ret
-    for k, data in table.items():
+    for k, attrib in table.items():
         # try get explicit value from item
         if (v := item.get(k)) is None:
-            # try get default value
-            v = data.get('d')
+            # try get default value, copying mutable ones so the spec table's value never ends up in (and modified by) the output
+            if isinstance((v := attrib.default), (list, dict)):
+                v = v.copy()
         # check if there is nested data, eg. in an Action
-        if isinstance(v, dict) and data.get('t') is list:
-            v = _arrayFromDict(v, data.get('l', {}), sdk_v, path=_keyPath(path, k), skip_invalid=skip_invalid)
+        if isinstance(v, dict) and attrib.typ is list:
+            v = _arrayFromDict(v, attrib.subtable or {}, sdk_v, path=_keyPath(path, k), skip_invalid=skip_invalid)
         # check that the value is valid and add it to the dict if it is
-        if validateAttribValue(k, v, data, sdk_v, path) or (not skip_invalid and v != None):
+        if _validateAttrib(attrib, v, sdk_v, path) or (not skip_invalid and v != None):
             ret[k] = v
     return ret
 
 
-def _arrayFromDict(d:dict, table:dict, sdk_v:int, category:str=None, path:str="", skip_invalid:bool=False):
+def _arrayFromDict(d:dict, table:dict, sdk_v:int, path:str="", skip_invalid:bool=False):
     ret = []
     if not isinstance(d, dict):
         return ret
     for key, item in d.items():
-        if not category or not (cat := item.get('category')) or cat == category:
-            ret.append(_dictFromItem(item, table, sdk_v, f"{path}[{key}]", skip_invalid))
+        ret.append(_dictFromItem(item, table, sdk_v, f"{path}[{key}]", skip_invalid))
     if path in ["actions","connectors"]:
         _replaceFormatTokens(ret)
     return ret
 
 
+def _itemsByCategory(d:dict, categories):
+    # Sorts items into a dict per category id, keeping their original order.
+    # Items w/out a category are added to all categories, and ones with an unknown category are dropped.
+    ret = {cat: {} for cat in categories}
+    if not isinstance(d, dict):
+        return ret
+    for key, item in d.items():
+        if not (cat := item.get('category')):
+            for cat_items in ret.values():
+                cat_items[key] = item
+        else:
+            try:
+                cat_items = ret.get(cat)
+            except TypeError:  # unhashable, so it can't match any category id
+                cat_items = None
+            if cat_items is not None:
+                cat_items[key] = item
+    return ret
+
+
 def _replaceFormatTokens(items:list):
     for d in items:
         if not isinstance(d, dict) or not 'format' in d.keys() or not 'data' in d.keys():
             continue
-        data_ids = {}
-        for data in d.get('data'):
-            if (did := data.get('id')):
-                data_ids[did.rsplit(".", 1)[-1]] = did
+        fmt = d.get('format')
+        if not isinstance(fmt, str) or "$[" not in fmt:
+            continue
+        # full data IDs in the order they are listed, for numeric tokens, and keyed by the last part of the ID for named tokens
+        data_ids = [did for data in d.get('data') if (did := data.get('id'))]
         if not data_ids:
             continue
-        fmt = d.get('format')
-        rx = re_compile(r'\$\[(\w+)\]')
-        begin = 0
-        while (m := rx.search(fmt, begin)):
+        data_names = {did.rsplit(".", 1)[-1]: did for did in data_ids}
+
+        def repl(m):
             idx = m.group(1)
-            if idx in data_ids.keys():
-                val = data_ids.get(idx)
-            elif idx.isdigit() and (i := int(idx) - 1) >= 0 and i < len(data_ids):
-                val = list(data_ids.values())[i]
-            else:
-                begin = m.end()
-                _addMessage(f"WARNING: Could not find replacement for token '{idx}' in 'format' attribute for element `{d.get('id')}`. The data arry does not contain this name/index.")
-                continue
-            # print(m.span(), val)
-            fmt = fmt[:m.start()] + "{$" + val + "$}" + fmt[m.end():]
-            begin = m.start() + len(val) + 4
-        d['format'] = fmt
+            if idx in data_names:
+                return "{$" + data_names[idx] + "$}"
+            if idx.isdigit() and 0 <= (i := int(idx) - 1) < len(data_ids):
+                return "{$" + data_ids[i] + "$}"
+            _addMessage(f"WARNING: Could not find replacement for token '{idx}' in 'format' attribute for element `{d.get('id')}`. The data arry does not contain this name/index.")
+            return m.group(0)
+
+        d['format'] = _FMT_TOKEN_RX.sub(repl, fmt)
 
 
 def generateDefinitionFromScript(script:Union[str, TextIO], skip_invalid:bool=False):
@@ -198,6 +232,8 @@ def generateDefinitionFromScript(script:Union[str, TextIO], skip_invalid:bool=Fa
     Note that the script is interpreted (executed), so any actual "business" logic (like connecting to TP) should be in "__main__".
     Also note that when using input from a file handle or string, the script's "__file__" attribute is set to the current working
     directory and the file name "tp_plugin.py".
+    A script loaded from a file path is cached, and is only executed again if the file's size or modification time changes.
+    The returned `dict` is always a separate copy, so changing it does not affect the cached script's declarations (or later results).
 
     May raise an `ImportError` if the plugin script could not be loaded or is missing required variables.
     Use `getMessages()` to check for any warnings/etc which may be generated (eg. from attribute validation).
@@ -216,15 +252,25 @@ def generateDefinitionFromScript(script:Union[str, TextIO], skip_invalid:bool=Fa
             setattr(plugin, "__file__", os.path.join(os.getcwd(), "tp_plugin.py"))
             exec(script_str, plugin.__dict__)
         else:
-            # load directly from a file path
-            spec = importlib.util.spec_from_file_location("plugin", script)
-            plugin = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(plugin)
+            # load directly from a file path, or re-use the module if the file hasn't changed since last time
+            st = os.stat(script)
+            real_path = os.path.realpath(script)
+            cached = g_module_cache.get(real_path)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                plugin = cached[2]
+            else:
+                spec = importlib.util.spec_from_file_location("plugin", script)
+                plugin = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(plugin)
+                # replaces any previous version of this file
+                g_module_cache[real_path] = (st.st_mtime_ns, st.st_size, plugin)
         # print(plugin.TP_PLUGIN_INFO)
     except Exception as e:
         input_name = "input stream" if script_str else script
         raise ImportError(f"ERROR while trying to import plugin code from '{input_name}': {repr(e)}")
-    return generateDefinitionFromModule(plugin, skip_invalid)
+    entry = generateDefinitionFromModule(plugin, skip_invalid)
+    # the entry may share mutable values with the plugin's declarations, which must not change if the module is cached
+    return entry if script_str else deepcopy(entry)
 
 
 def generateDefinitionFromModule(plugin:ModuleType, skip_invalid:bool=False):
@@ -292,15 +338,21 @@ def generateDefinitionFromDeclaration(info:dict, categories:dict, skip_invalid:b
     # Get the target SDK version (was either specified in plugin or is TPSDK_DEFAULT_VERSION)
     tgt_sdk_v = entry['sdk']
 
+    # Sort actions, states, events, and connectors by category up front, so each collection is only scanned once.
+    actions = _itemsByCategory(actions, categories)
+    states = _itemsByCategory(states, categories)
+    events = _itemsByCategory(events, categories)
+    connectors = _itemsByCategory(connectors, categories)
+
     # Loop over each plugin category and set up actions, states, events, and connectors.
     for cat, data in categories.items():
         path = f"category[{cat}]"
         category = _dictFromItem(data, TPSDK_ATTRIBS_CATEGORY, tgt_sdk_v, path, skip_invalid)
-        category['actions'] = _arrayFromDict(actions, TPSDK_ATTRIBS_ACTION, tgt_sdk_v, cat, "actions", skip_invalid)
-        category['states'] = _arrayFromDict(states, TPSDK_ATTRIBS_STATE, tgt_sdk_v, cat, "states", skip_invalid)
-        category['events'] = _arrayFromDict(events, TPSDK_ATTRIBS_EVENT, tgt_sdk_v, cat, "events", skip_invalid)
+        category['actions'] = _arrayFromDict(actions[cat], TPSDK_ATTRIBS_ACTION, tgt_sdk_v, "actions", skip_invalid)
+        category['states'] = _arrayFromDict(states[cat], TPSDK_ATTRIBS_STATE, tgt_sdk_v, "states", skip_invalid)
+        category['events'] = _arrayFromDict(events[cat], TPSDK_ATTRIBS_EVENT, tgt_sdk_v, "events", skip_invalid)
         if tgt_sdk_v >= 4:
-            category['connectors'] = _arrayFromDict(connectors, TPSDK_ATTRIBS_CONNECTOR, tgt_sdk_v, cat, "connectors", skip_invalid)
+            category['connectors'] = _arrayFromDict(connectors[cat], TPSDK_ATTRIBS_CONNECTOR, tgt_sdk_v, "connectors", skip_invalid)
         # add the category to entry's categories array
         entry['categories'].append(category)
 
@@ -313,7 +365,7 @@ def generateDefinitionFromDeclaration(info:dict, categories:dict, skip_invalid:b
 
 ## Validation functions
 
-def validateAttribValue(key:str, value, attrib_data:dict, sdk_v:int, path:str=""):
+def validateAttribValue(key:str, value, attrib_data:Union[AttribSpec, dict], sdk_v:int, path:str=""):
     """
     Validates one attribute's value based on provided lookup table and target SDK version.
     Returns `False` if any validation fails or `value` is `None`, `True` otherwise.
@@ -322,23 +374,32 @@ def validateAttribValue(key:str, value, attrib_data:dict, sdk_v:int, path:str=""
     Args:
         `key` is the attribute name;
         `value` is what to validate;
-        `attrib_data` is the lookup table data for the given key (eg. `TPSDK_ATTRIBS_INFO[key]` );
+        `attrib_data` is the lookup table data for the given key (eg. `TPSDK_ATTRIBS_ROOT[key]`), either an `AttribSpec`
+            or a `dict` in the raw table format (eg. `TPSDK_ATTRIBS_ROOT_RAW[key]`);
         `sdk_v` is the TP SDK version being used (for validation).
         `path` is just extra information to print before the key name in warning messages (to show where attribute is in the tree).
     """
+    if isinstance(attrib_data, dict):
+        attrib_data = attribSpecFromDict(key, attrib_data)
+    elif attrib_data.name != key:
+        attrib_data = attrib_data._replace(name=key)
+    return _validateAttrib(attrib_data, value, sdk_v, path)
+
+def _validateAttrib(attrib:AttribSpec, value, sdk_v:int, path:str=""):
     global g_seen_ids
+    key = attrib.name
     keypath = _keyPath(path, key)
     if value is None:
-        if attrib_data.get('r'):
+        if attrib.required:
             _addMessage(f"WARNING: Missing required attribute '{keypath}'.")
         return False
-    if not isinstance(value, (exp_typ := attrib_data.get('t', str))):
+    if not isinstance(value, (exp_typ := attrib.typ)):
         _addMessage(f"WARNING: Wrong data type for attribute '{keypath}'. Expected {exp_typ} but got {type(value)}")
         return False
-    if sdk_v < (min_sdk := attrib_data.get('v', sdk_v)):
+    if (min_sdk := attrib.min_sdk) is not None and sdk_v < min_sdk:
         _addMessage(f"WARNING: Wrong SDK version for attribute '{keypath}'. Minimum is v{min_sdk} but using v{sdk_v}")
         return False
-    if (choices := attrib_data.get('c')) and value not in choices:
+    if (choices := attrib.choices) and value not in choices:
         _addMessage(f"WARNING: Value error for attribute '{keypath}'. Got '{value}' but expected one of {choices}")
         return False
     if key == "id":
@@ -352,20 +413,21 @@ def validateAttribValue(key:str, value, attrib_data:dict, sdk_v:int, path:str=""
 def _validateDefinitionDict(d:dict, table:dict, sdk_v:int, path:str=""):
     # iterate over existing attributes to validate them
     for k, v in d.items():
-        adata = table.get(k)
+        attrib = table.get(k)
         keypath = _keyPath(path, k)
-        if not adata:
+        if not attrib:
             _addMessage(f"WARNING: Attribute '{keypath}' is unknown.")
             continue
-        if not validateAttribValue(k, v, adata, sdk_v, path):
+        if not _validateAttrib(attrib, v, sdk_v, path):
             continue
         # print(k, v, type(v))
-        if isinstance(v, list) and (ltable := adata.get('l')):
+        if isinstance(v, list) and (ltable := attrib.subtable):
             _validateDefinitionArray(v, ltable, sdk_v, keypath)
-    # iterate over table entries to check if all required attribs are present
-    for k, data in table.items():
-        if data.get('r') and k not in d.keys():
-            _addMessage(f"WARNING: Missing required attribute '{_keyPath(path, k)}'.")
+    # check if all required attribs are present, reporting any missing ones in table order
+    if (missing := table.required - d.keys()):
+        for k in table.keys():
+            if k in missing:
+                _addMessage(f"WARNING: Missing required attribute '{_keyPath(path, k)}'.")
 
 def _validateDefinitionArray(a:list, table:dict, sdk_v:int, path:str=""):
     i = 0
@@ -406,28 +468,36 @@ def validateDefinitionFile(file:Union[str, TextIO]):
     Returns `True` if no problems were found, `False` otherwise.
     Use `getMessages()` to check for any validation warnings which may be generated.
     """
-    fh = file
-    if isinstance(fh, str):
-        fh = open(file, 'r')
-    ret = validateDefinitionObject(json.load(fh))
-    if fh != file:
-        fh.close()
-    return ret
+    if isinstance(file, str):
+        with open(file, 'r', encoding='utf-8', buffering=1<<16) as fh:
+            return validateDefinitionObject(json.load(fh))
+    return validateDefinitionObject(json.load(file))
 
 
 ## CLI handlers
 
+def _writeJson(obj, fh:TextIO, indent):
+    # orjson only supports 2 space indents (or none) and writes bytes, so fall back to json module if we can't use it.
+    if orjson is not None and indent in (None, 2) and hasattr(fh, "buffer"):
+        # serialize first, so nothing is written if it fails
+        data = orjson.dumps(obj, option=(orjson.OPT_INDENT_2 if indent else 0) | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        fh.flush()
+        fh.buffer.write(data)
+    else:
+        json.dump(obj, fh, indent=indent)
+        fh.write("\n")
+
+
 def _generateDefinition(script, output_path, indent, skip_invalid:bool=False):
     input_name = "input stream"
     if isinstance(script, str):
-        if len(script.split(".")) < 2:
+        if not os.path.splitext(script)[1]:
             script = script + ".py"
         input_name = script
     indent = None if indent is None or int(indent) < 0 else indent
 
     _printToErr(f"Generating plugin definition JSON from '{input_name}'...\n")
     entry = generateDefinitionFromScript(script, skip_invalid)
-    entry_str = json.dumps(entry, indent=indent) + "\n"
     valid = True
     if (messages := getMessages()):
         valid = False
@@ -435,21 +505,42 @@ def _generateDefinition(script, output_path, indent, skip_invalid:bool=False):
         _printToErr("")
     # output
     if output_path:
-        # write it to a file
-        with open(output_path, "w") as entry_file:
-            entry_file.write(entry_str)
+        # write it to a temporary file first, so an existing output file is only replaced if serialization succeeds
+        tmp_path = output_path + ".tmp"
+        try:
+            with open(tmp_path, "w", buffering=1<<16) as entry_file:
+                _writeJson(entry, entry_file, indent)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         _printToErr(f"Saved generated JSON to '{output_path}'\n")
     else:
         # send to stdout
-        print(entry_str)
+        _writeJson(entry, sys.stdout, indent)
     _printToErr(f"Finished generating plugin definition JSON from '{input_name}'.\n")
-    return entry_str, valid
+    return entry, valid
+
+
+def _jsonArrays(obj):
+    # Returns a copy of `obj` with any tuples converted to lists, as they would be after a JSON round-trip.
+    if isinstance(obj, dict):
+        return {k: _jsonArrays(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonArrays(v) for v in obj]
+    return obj
 
 
 def _validateDefinition(entry, as_str=False):
-    name = entry if isinstance(entry, str) and not as_str else "input stream"
+    if isinstance(entry, dict):
+        name = "generated definition"
+    else:
+        name = entry if isinstance(entry, str) and not as_str else "input stream"
     _printToErr(f"Validating '{name}', any errors or warnings will be printed below...\n")
-    if as_str:
+    if isinstance(entry, dict):
+        # validate the generated dict as it was written out, eg. tuples are JSON arrays
+        res = validateDefinitionObject(_jsonArrays(entry))
+    elif as_str:
         res = validateDefinitionString(entry)
     else:
         res = validateDefinitionFile(entry)
@@ -461,7 +552,8 @@ def _validateDefinition(entry, as_str=False):
     return res
 
 
-def _main():
+def main():
+    """ Command-line entry point (`tppsdk` console script). See module documentation for usage. Returns the exit status code. """
     from argparse import ArgumentParser
 
     parser = ArgumentParser(epilog="This script exits with status code -1 (error) if generation or validation produces warning messages about malformed data. "
@@ -493,7 +585,7 @@ def _main():
         opts.target = sys.stdin
 
     valid = True
-    entry_str = ""
+    entry = None
     if opts.generate:
         opts.target = _normPath(opts.target or "main.py")
         output_path = None
@@ -503,13 +595,12 @@ def _main():
         else:
             out_dir = os.getcwd() if hasattr(opts.target, "read") else os.path.dirname(opts.target)
             output_path = os.path.join(out_dir, "entry.tp")
-        entry_str, valid = _generateDefinition(opts.target, output_path, opts.indent, opts.skip_invalid)
-        if opts.validate and output_path:
-            opts.target = output_path
+        entry, valid = _generateDefinition(opts.target, output_path, opts.indent, opts.skip_invalid)
 
     if opts.validate:
-        if entry_str:
-            valid = _validateDefinition(entry_str, True)
+        if entry is not None:
+            # validate the generated definition directly, w/out a JSON round-trip
+            valid = _validateDefinition(entry)
         else:
             opts.target = _normPath(opts.target or "entry.tp")
             valid = _validateDefinition(opts.target)
@@ -518,4 +609,4 @@ def _main():
 
 
 if __name__ == "__main__":
-    sys.exit(_main())
+    sys.exit(main())